@@ -9,17 +9,27 @@ __version__ = '0.1.0'
 from .keychain import (
     get_from_keychain,
     store_in_keychain,
+    store_many_in_keychain,
+    is_storable_value,
+    invalidate_cache,
     get_specific_detail,
     get_organization_details,
     SERVICE_NAME,
-    ORG_KEYS
+    ORG_KEYS,
+    ORG_KEYS_SET,
+    SENSITIVE_KEYS
 )
 
 __all__ = [
     'get_from_keychain',
     'store_in_keychain',
+    'store_many_in_keychain',
+    'is_storable_value',
+    'invalidate_cache',
     'get_specific_detail',
     'get_organization_details',
     'SERVICE_NAME',
-    'ORG_KEYS'
+    'ORG_KEYS',
+    'ORG_KEYS_SET',
+    'SENSITIVE_KEYS'
 ] 
\ No newline at end of file
@@ -4,25 +4,31 @@ Command Line Interface
 This module provides CLI functionality for managing credentials.
 """
 
-import argparse
-import getpass
 import sys
-import os
 import re
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
 
 from .keychain import (
-    get_from_keychain,
     store_in_keychain,
+    store_many_in_keychain,
+    is_storable_value,
     get_organization_details,
     get_specific_detail,
     SERVICE_NAME,
-    ORG_KEYS
+    ORG_KEYS,
+    ORG_KEYS_SET,
+    SENSITIVE_KEYS
 )
 
+if TYPE_CHECKING:
+    import argparse
+
+# Matches credential lines in the format KEY = "VALUE" or KEY = 'VALUE'
+_CRED_RE = re.compile(r'([A-Z_]+)\s*=\s*["\']([^"\']*)["\']')
+
 def mask_sensitive_value(key: str, value: str) -> str:
     """Mask sensitive information for display."""
-    if any(sensitive in key for sensitive in ['SSN', 'EIN', 'BANK', 'ACCT', 'ROUTING']):
+    if key in SENSITIVE_KEYS:
         if len(value) > 4:
             return '*' * (len(value) - 4) + value[-4:]
         else:
@@ -33,20 +39,22 @@ def parse_credentials_file(file_path: str) -> Dict[str, str]:
     """Parse a file containing credentials in the format KEY = "VALUE"."""
     credentials = {}
     
-    if not os.path.exists(file_path):
+    try:
+        f = open(file_path, 'r', buffering=1 << 16)
+    except FileNotFoundError:
         print(f"Error: File {file_path} does not exist.")
         sys.exit(1)
     
-    with open(file_path, 'r') as f:
-        content = f.read()
-    
-    # Find all key-value pairs in the format KEY = "VALUE" or KEY = 'VALUE'
-    pattern = r'([A-Z_]+)\s*=\s*["\']([^"\']*)["\']'
-    matches = re.findall(pattern, content)
-    
-    for key, value in matches:
-        if key in ORG_KEYS:
-            credentials[key] = value
+    # Scan line by line so large files are never held in memory at once
+    with f:
+        for line in f:
+            for match in _CRED_RE.finditer(line):
+                if match.group(1) in ORG_KEYS_SET:
+                    credentials[match.group(1)] = match.group(2)
+                    
+                    # Stop early once every known key has been found
+                    if len(credentials) == len(ORG_KEYS_SET):
+                        return credentials
     
     return credentials
 
@@ -56,19 +64,14 @@ def list_credentials():
     print(f"Service name: {SERVICE_NAME}")
     print()
     
-    found_any = False
+    # Details come back in ORG_KEYS order, fetched concurrently
+    details = get_organization_details()
     
-    for key in ORG_KEYS:
-        value = get_from_keychain(SERVICE_NAME, key)
-        
-        if value is None:
-            continue
-            
+    for key, value in details.items():
         display_value = mask_sensitive_value(key, value)
         print(f"{key}: {display_value}")
-        found_any = True
     
-    if not found_any:
+    if not details:
         print("No organization credentials found.")
         print("Run 'mcp-credentials store' to add organization details to the Keychain.")
     
@@ -77,15 +80,15 @@ def list_credentials():
 
 def store_credential(key: str, value: str = None):
     """Store a single credential in the keychain."""
-    if key not in ORG_KEYS:
+    if key not in ORG_KEYS_SET:
         print(f"Error: Unknown key '{key}'")
         print(f"Available keys: {', '.join(ORG_KEYS)}")
         sys.exit(1)
     
     if value is None:
         # Prompt for the value with masked input if sensitive
-        is_sensitive = any(sensitive in key for sensitive in ['SSN', 'EIN', 'BANK', 'ACCT', 'ROUTING'])
-        if is_sensitive:
+        if key in SENSITIVE_KEYS:
+            import getpass
             value = getpass.getpass(f"Enter value for {key}: ")
         else:
             value = input(f"Enter value for {key}: ")
@@ -94,6 +97,10 @@ def store_credential(key: str, value: str = None):
         print("Error: Value cannot be empty.")
         sys.exit(1)
     
+    if not is_storable_value(value):
+        print("Error: Value cannot contain line breaks or NUL characters.")
+        sys.exit(1)
+    
     # Store the credential
     if store_in_keychain(SERVICE_NAME, key, value):
         print(f"Successfully stored {key} in Keychain.")
@@ -129,10 +136,12 @@ def store_credentials_from_file(file_path: str, yes: bool = False):
             sys.exit(0)
     
     # Store the credentials
+    print(f"Storing {', '.join(credentials)}...")
+    results = store_many_in_keychain(SERVICE_NAME, credentials)
+    
     success = True
-    for key, value in credentials.items():
-        print(f"Storing {key}...")
-        if not store_in_keychain(SERVICE_NAME, key, value):
+    for key, stored in results.items():
+        if not stored:
             print(f"Failed to store {key}.")
             success = False
     
@@ -141,8 +150,19 @@ def store_credentials_from_file(file_path: str, yes: bool = False):
     else:
         print("\n⚠️ Some credentials could not be stored.")
 
-def main():
-    """Main entry point for the CLI."""
+def print_credential(key: str):
+    """Print a single credential from the keychain."""
+    value = get_specific_detail(key)
+    if value:
+        print(value)
+    else:
+        print(f"No value found for {key}")
+        sys.exit(1)
+
+def build_parser() -> "argparse.ArgumentParser":
+    """Build the argument parser for the CLI."""
+    import argparse
+    
     parser = argparse.ArgumentParser(description="MCP Credentials - Secure Credential Management")
     subparsers = parser.add_subparsers(dest="command", help="Command to execute")
     
@@ -163,7 +183,21 @@ def main():
     get_parser = subparsers.add_parser("get", help="Get a stored credential")
     get_parser.add_argument("key", choices=ORG_KEYS, help="The credential key to retrieve")
     
+    return parser
+
+def main():
+    """Main entry point for the CLI."""
+    # Fast path for the simple read commands, which need no argparse setup
+    argv = sys.argv[1:]
+    if len(argv) == 2 and argv[0] == "get" and argv[1] in ORG_KEYS_SET:
+        print_credential(argv[1])
+        return
+    if argv == ["list"]:
+        list_credentials()
+        return
+    
     # Parse arguments
+    parser = build_parser()
     args = parser.parse_args()
     
     # Handle commands
@@ -174,12 +208,7 @@ def main():
     elif args.command == "store-file":
         store_credentials_from_file(args.file, args.yes)
     elif args.command == "get":
-        value = get_specific_detail(args.key)
-        if value:
-            print(value)
-        else:
-            print(f"No value found for {args.key}")
-            sys.exit(1)
+        print_credential(args.key)
     else:
         parser.print_help()
 
@@ -5,8 +5,11 @@ This module provides functions for securely storing and retrieving
 credentials from the macOS Keychain.
 """
 
+import os
 import subprocess
-from typing import Dict, Optional, Any, List, Union
+import threading
+import time
+from typing import Dict, Optional, Any, List, Tuple, Union
 
 # Service name for the keychain entries
 SERVICE_NAME = "mcp-servers"
@@ -22,34 +25,147 @@ ORG_KEYS = [
     "COMPANY_OWNER"
 ]
 
-def get_from_keychain(service: str, account: str) -> Optional[str]:
+# Set view of ORG_KEYS for membership checks
+ORG_KEYS_SET = frozenset(ORG_KEYS)
+
+# Key name fragments that mark a credential as sensitive
+SENSITIVE_PATTERNS = ('SSN', 'EIN', 'BANK', 'ACCT', 'ROUTING')
+
+# Keys whose values are masked for display
+SENSITIVE_KEYS = frozenset(
+    key for key in ORG_KEYS
+    if any(pattern in key for pattern in SENSITIVE_PATTERNS)
+)
+
+# Absolute path to the security tool, so no PATH lookup is needed
+_SECURITY_PATH = "/usr/bin/security"
+
+# Minimal environment for security. HOME and the user identity are kept so
+# the tool can still locate the user's login keychain.
+_SECURITY_ENV = {
+    "PATH": "/usr/bin",
+    **{
+        name: os.environ[name]
+        for name in ("HOME", "USER", "LOGNAME", "TMPDIR")
+        if name in os.environ
+    },
+}
+
+# Seconds a cached keychain value stays valid
+CACHE_TTL = 60.0
+
+# In-memory cache of keychain lookups: (service, account) -> (timestamp, value)
+_cache: Dict[Tuple[str, str], Tuple[float, Optional[str]]] = {}
+
+# Per-key write generations. A lookup only caches its result if no write
+# happened while it was running, so a stale read cannot undo an invalidation.
+_generations: Dict[Tuple[str, str], int] = {}
+_cache_lock = threading.Lock()
+
+def invalidate_cache(service: str, account: str) -> None:
+    """
+    Drop a cached keychain value so the next lookup hits the Keychain.
+    
+    Args:
+        service: The service name
+        account: The account/key name
+    """
+    with _cache_lock:
+        _generations[(service, account)] = _generations.get((service, account), 0) + 1
+        _cache.pop((service, account), None)
+
+def _run_security(args: List[str], **kwargs) -> subprocess.CompletedProcess:
+    """
+    Run the security tool with a minimal environment.
+    
+    close_fds=False lets subprocess use posix_spawn instead of fork+exec;
+    it is safe because Python creates file descriptors non-inheritable.
+    
+    Args:
+        args: Arguments to pass to security
+        **kwargs: Extra keyword arguments for subprocess.run
+        
+    Returns:
+        subprocess.CompletedProcess: The completed process
+    """
+    return subprocess.run([_SECURITY_PATH] + args, env=_SECURITY_ENV, close_fds=False, **kwargs)
+
+def _quote_security_arg(value: str) -> str:
+    """Quote an argument for a command line read by `security -i`."""
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+def _find_in_keychain(service: str, account: str) -> Optional[str]:
+    """Look up a password with `security`, bypassing the in-memory cache."""
+    cmd = ["find-generic-password", "-s", service, "-a", account, "-w"]
+    result = _run_security(cmd, capture_output=True, text=True, check=False)
+    
+    if result.returncode == 0:
+        return result.stdout.strip()
+    
+    # Item not found or other error
+    return None
+
+def get_from_keychain(service: str, account: str, use_cache: bool = True) -> Optional[str]:
     """
     Retrieve a password from the macOS Keychain.
     
+    Values are cached in memory for a short time so repeated reads within
+    one session do not spawn a new `security` process each time.
+    
     Args:
         service: The service name
         account: The account/key name
+        use_cache: Whether a cached value may be returned. When False the
+            Keychain is always queried and the cache is refreshed.
         
     Returns:
         str: The retrieved password/value, or None if not found
     """
+    cache_key = (service, account)
+    with _cache_lock:
+        # Evict expired entries so plaintext values do not outlive the TTL
+        now = time.monotonic()
+        for expired in [k for k, (ts, _) in _cache.items() if now - ts >= CACHE_TTL]:
+            del _cache[expired]
+        
+        cached = _cache.get(cache_key)
+        generation = _generations.get(cache_key, 0)
+    if use_cache and cached is not None:
+        return cached[1]
+    
     try:
-        cmd = ["security", "find-generic-password", "-s", service, "-a", account, "-w"]
-        result = subprocess.run(cmd, capture_output=True, text=True, check=False)
+        value = _find_in_keychain(service, account)
         
-        if result.returncode == 0:
-            return result.stdout.strip()
-        else:
-            # Item not found or other error - return None silently
-            return None
+        with _cache_lock:
+            if _generations.get(cache_key, 0) == generation:
+                _cache[cache_key] = (time.monotonic(), value)
+        return value
     except Exception as e:
         print(f"❌ Error retrieving {account}: {str(e)}")
         return None
 
+def is_storable_value(value: str) -> bool:
+    """
+    Check whether a value can be written to the Keychain.
+    
+    Writes go through `security -i`, which reads one command per line, so
+    values containing line breaks or NUL characters cannot be stored.
+    
+    Args:
+        value: The password/value to check
+        
+    Returns:
+        bool: True if the value can be stored, False otherwise
+    """
+    return not any(c in value for c in "\r\n\0")
+
 def store_in_keychain(service: str, account: str, password: str) -> bool:
     """
     Store a password in the macOS Keychain.
     
+    The password is written to the `security` process on stdin rather than
+    passed on the command line, so it never shows up in the process table.
+    
     Args:
         service: The service name
         account: The account/key name
@@ -58,36 +174,87 @@ def store_in_keychain(service: str, account: str, password: str) -> bool:
     Returns:
         bool: True if successful, False otherwise
     """
+    return store_many_in_keychain(service, {account: password})[account]
+
+def store_many_in_keychain(service: str, items: Dict[str, str]) -> Dict[str, bool]:
+    """
+    Store several passwords in the macOS Keychain with one `security` process.
+    
+    The add commands are fed to `security -i` on stdin, so the passwords never
+    show up in the process table. Values rejected by is_storable_value are
+    not stored.
+    
+    Args:
+        service: The service name
+        items: Mapping of account/key names to the passwords/values to store
+        
+    Returns:
+        Dict[str, bool]: Whether each account was stored successfully
+    """
+    results = {}
+    commands = []
+    for account, password in items.items():
+        if not is_storable_value(password):
+            print(f"❌ Cannot store {account}: value contains a line break or NUL character")
+            results[account] = False
+            continue
+        
+        # Add the password, updating any existing item in place (-U)
+        commands.append(
+            f"add-generic-password -U -s {_quote_security_arg(service)} "
+            f"-a {_quote_security_arg(account)} -w {_quote_security_arg(password)}\n"
+        )
+        results[account] = True
+    
+    if not commands:
+        return results
+    
     try:
-        # Delete any existing password for this service and account
-        subprocess.run(
-            ["security", "delete-generic-password", "-s", service, "-a", account],
-            stderr=subprocess.DEVNULL,
+        result = _run_security(
+            ["-i"],
+            input="".join(commands),
+            capture_output=True,
+            text=True,
             check=False,
         )
         
-        # Add the new password
-        subprocess.run(
-            ["security", "add-generic-password", "-s", service, "-a", account, "-w", password],
-            check=True,
-            stderr=subprocess.DEVNULL,
-        )
-        return True
-    except subprocess.CalledProcessError:
-        return False
+        # Interactive mode does not report which command failed, so on any
+        # error read each item back to find out what was actually stored
+        if result.returncode != 0 or result.stderr.strip():
+            for account, stored in results.items():
+                if stored:
+                    results[account] = _find_in_keychain(service, account) == items[account]
+    finally:
+        for account in items:
+            invalidate_cache(service, account)
+    
+    return results
 
-def get_organization_details() -> Dict[str, str]:
+def get_organization_details(use_cache: bool = True) -> Dict[str, str]:
     """
     Retrieve all organization details from the Keychain.
     
+    The lookups run concurrently, one `security` process per key, so the
+    total wait is roughly that of a single lookup.
+    
+    Args:
+        use_cache: Whether cached values may be returned
+        
     Returns:
         Dict[str, str]: Dictionary of organization details
     """
-    details = {}
-    for key in ORG_KEYS:
-        value = get_from_keychain(SERVICE_NAME, key)
-        if value:
-            details[key] = value
+    from concurrent.futures import ThreadPoolExecutor
+    
+    with ThreadPoolExecutor(max_workers=len(ORG_KEYS)) as executor:
+        values = executor.map(
+            lambda key: get_from_keychain(SERVICE_NAME, key, use_cache),
+            ORG_KEYS,
+        )
+        
+        details = {}
+        for key, value in zip(ORG_KEYS, values):
+            if value:
+                details[key] = value
     return details
 
 def get_specific_detail(key: str) -> Optional[str]:
@@ -100,7 +267,7 @@ def get_specific_detail(key: str) -> Optional[str]:
     Returns:
         Optional[str]: The value, or None if not found
     """
-    if key not in ORG_KEYS:
+    if key not in ORG_KEYS_SET:
         print(f"❌ Unknown key: {key}")
         print(f"Available keys: {', '.join(ORG_KEYS)}")
         return None
@@ -5,25 +5,35 @@ This module provides a REST API server for managing credentials.
 """
 
 import os
-import json
-import argparse
-import hashlib
-import hmac
 import time
-from typing import Dict, List, Union, Optional
-from http.server import HTTPServer, BaseHTTPRequestHandler
-from urllib.parse import parse_qs, urlparse
+from typing import Dict, List, Tuple, Union, Optional
 
 from .keychain import (
     get_from_keychain,
     store_in_keychain,
+    is_storable_value,
     get_organization_details,
     get_specific_detail,
+    CACHE_TTL,
     SERVICE_NAME,
-    ORG_KEYS
+    ORG_KEYS,
+    ORG_KEYS_SET,
+    SENSITIVE_KEYS
 )
 
+def _mask_sensitive_value(key: str, value: str) -> str:
+    """Mask sensitive information for display."""
+    if key in SENSITIVE_KEYS:
+        if len(value) > 4:
+            return '*' * (len(value) - 4) + value[-4:]
+        else:
+            return '*' * len(value)
+    return value
+
 class CredentialServer:
+    # Constant part of the GET /credentials response
+    _STATIC_META = {"service": SERVICE_NAME, "available_keys": ORG_KEYS}
+    
     def __init__(self, host: str = "localhost", port: int = 8000, api_key: str = None):
         """Initialize the credential server."""
         self.host = host
@@ -36,16 +46,28 @@ class CredentialServer:
             print(f"⚠️ Generated temporary API key: {self.api_key}")
             print(f"⚠️ This key will be valid only for this server instance.")
         
-        self.server = None
+        # Encoded once so request validation compares raw bytes
+        self._api_key_bytes = self.api_key.encode("utf-8")
+        self.app = None
+        
+        # Serialized GET /credentials body as (timestamp, bytes). It is
+        # dropped on every write, and the generation counter keeps a rebuild
+        # that raced with a write from storing stale data.
+        self._list_response: Optional[Tuple[float, bytes]] = None
+        self._list_response_generation = 0
+        self._list_response_lock = None
     
     def _generate_api_key(self) -> str:
         """Generate a temporary API key."""
-        return hashlib.sha256(str(time.time()).encode()).hexdigest()
+        import secrets
+        
+        return secrets.token_hex(32)
     
     def start(self):
         """Start the credential server."""
-        handler = self._create_request_handler()
-        self.server = HTTPServer((self.host, self.port), handler)
+        from aiohttp import web
+        
+        self.app = self._create_app()
         
         print(f"Starting Secrets Manager server on http://{self.host}:{self.port}")
         print(f"API endpoints:")
@@ -54,170 +76,210 @@ class CredentialServer:
         print(f"  POST /credentials/:key  - Store a credential")
         print(f"Press Ctrl+C to stop the server.")
         
-        try:
-            self.server.serve_forever()
-        except KeyboardInterrupt:
-            print("\nStopping server...")
-            self.server.server_close()
+        # run_app handles Ctrl+C itself and returns once the server is closed
+        web.run_app(
+            self.app,
+            host=self.host,
+            port=self.port,
+            print=None,
+            access_log_class=self._create_access_logger(),
+        )
+        print("\nStopping server...")
     
-    def _create_request_handler(self):
-        """Create a request handler class with access to the server instance."""
-        api_key = self.api_key
-        
-        class CredentialRequestHandler(BaseHTTPRequestHandler):
-            def _validate_api_key(self) -> bool:
-                """Validate the API key from the request headers."""
-                auth_header = self.headers.get("Authorization", "")
-                
-                if not auth_header.startswith("Bearer "):
-                    return False
-                
-                request_api_key = auth_header[7:]  # Remove "Bearer " prefix
-                return hmac.compare_digest(api_key, request_api_key)
-            
-            def _send_response_json(self, data: Dict, status: int = 200):
-                """Send a JSON response."""
-                self.send_response(status)
-                self.send_header("Content-Type", "application/json")
-                self.end_headers()
-                self.wfile.write(json.dumps(data).encode())
-            
-            def _send_error_json(self, error: str, status: int = 400):
-                """Send an error response."""
-                self._send_response_json({"error": error}, status)
-            
-            def _get_json_body(self) -> Dict:
-                """Get the JSON body from the request."""
-                content_length = int(self.headers.get("Content-Length", 0))
-                if content_length == 0:
-                    return {}
-                
-                body = self.rfile.read(content_length).decode()
-                return json.loads(body)
-            
-            def _parse_url(self) -> Dict:
-                """Parse the URL to extract path and query parameters."""
-                url = urlparse(self.path)
-                path = url.path.strip("/").split("/")
-                query = parse_qs(url.query)
-                
-                return {
-                    "path": path,
-                    "query": query
-                }
-            
-            def _mask_sensitive_value(self, key: str, value: str) -> str:
-                """Mask sensitive information for display."""
-                if any(sensitive in key for sensitive in ['SSN', 'EIN', 'BANK', 'ACCT', 'ROUTING']):
-                    if len(value) > 4:
-                        return '*' * (len(value) - 4) + value[-4:]
-                    else:
-                        return '*' * len(value)
-                return value
-            
-            def do_GET(self):
-                """Handle GET requests."""
-                if not self._validate_api_key():
-                    self._send_error_json("Invalid API key", 401)
-                    return
-                
-                url_data = self._parse_url()
-                path = url_data["path"]
-                
-                if len(path) == 1 and path[0] == "credentials":
-                    # List all credentials
-                    details = get_organization_details()
-                    
-                    # Mask sensitive values
-                    masked_details = {}
-                    for key, value in details.items():
-                        masked_details[key] = self._mask_sensitive_value(key, value)
-                    
-                    self._send_response_json({
-                        "service": SERVICE_NAME,
-                        "credentials": masked_details,
-                        "available_keys": ORG_KEYS
-                    })
-                
-                elif len(path) == 2 and path[0] == "credentials":
-                    # Get a specific credential
-                    key = path[1]
-                    
-                    if key not in ORG_KEYS:
-                        self._send_error_json(f"Unknown key: {key}", 404)
-                        return
-                    
-                    value = get_specific_detail(key)
-                    
-                    if value is None:
-                        self._send_error_json(f"No value found for key: {key}", 404)
-                        return
-                    
-                    self._send_response_json({
-                        "key": key,
-                        "value": value,
-                        "masked_value": self._mask_sensitive_value(key, value)
-                    })
-                
-                else:
-                    # Unknown endpoint
-                    self._send_error_json("Unknown endpoint", 404)
-            
-            def do_POST(self):
-                """Handle POST requests."""
-                if not self._validate_api_key():
-                    self._send_error_json("Invalid API key", 401)
-                    return
-                
-                url_data = self._parse_url()
-                path = url_data["path"]
-                
-                if len(path) == 2 and path[0] == "credentials":
-                    # Store a credential
-                    key = path[1]
-                    
-                    if key not in ORG_KEYS:
-                        self._send_error_json(f"Unknown key: {key}", 400)
-                        return
-                    
-                    try:
-                        body = self._get_json_body()
-                    except json.JSONDecodeError:
-                        self._send_error_json("Invalid JSON body", 400)
-                        return
-                    
-                    if "value" not in body:
-                        self._send_error_json("Missing required field: value", 400)
-                        return
-                    
-                    value = body["value"]
-                    
-                    if not value:
-                        self._send_error_json("Value cannot be empty", 400)
-                        return
-                    
-                    # Store the credential
-                    if store_in_keychain(SERVICE_NAME, key, value):
-                        self._send_response_json({
-                            "message": f"Successfully stored {key} in Keychain",
-                            "key": key,
-                            "masked_value": self._mask_sensitive_value(key, value)
-                        })
-                    else:
-                        self._send_error_json(f"Failed to store {key} in Keychain", 500)
-                
-                else:
-                    # Unknown endpoint
-                    self._send_error_json("Unknown endpoint", 404)
-            
-            def log_message(self, format, *args):
-                """Override log_message to print with timestamp."""
-                print(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] {self.address_string()} - {format % args}")
-        
-        return CredentialRequestHandler
+    def _create_access_logger(self):
+        """Create an access logger that prints each request with a timestamp."""
+        from aiohttp.abc import AbstractAccessLogger
+        
+        class CredentialAccessLogger(AbstractAccessLogger):
+            def log(self, request, response, time_taken):
+                """Print the request line and response status."""
+                version = f"HTTP/{request.version.major}.{request.version.minor}"
+                print(
+                    f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] {request.remote} - "
+                    f"\"{request.method} {request.path_qs} {version}\" {response.status} -"
+                )
+        
+        return CredentialAccessLogger
+    
+    def _create_app(self):
+        """Create the web application with access to the server instance."""
+        import asyncio
+        import hmac
+        import json
+        from aiohttp import web
+        
+        # Prefer orjson for encoding and decoding, falling back to the
+        # standard library when it is not installed
+        try:
+            import orjson
+            json_dumps = orjson.dumps
+            json_loads = orjson.loads
+        except ImportError:
+            def json_dumps(data) -> bytes:
+                return json.dumps(data).encode()
+            json_loads = json.loads
+        
+        api_key_bytes = self._api_key_bytes
+        
+        # Serialize the static metadata once as an open JSON object, ready
+        # for the "credentials" member to be appended per request
+        static_meta_bytes = json_dumps(self._STATIC_META)[:-1] + b','
+        
+        def response_bytes(body: bytes, status: int = 200) -> web.Response:
+            """Build a response from an already serialized JSON body."""
+            return web.Response(body=body, status=status, content_type="application/json")
+        
+        def response_json(data: Dict, status: int = 200) -> web.Response:
+            """Build a JSON response."""
+            return response_bytes(json_dumps(data), status)
+        
+        def error_json(error: str, status: int = 400) -> web.Response:
+            """Build an error response."""
+            return response_json({"error": error}, status)
+        
+        def run_blocking(func, *args):
+            """Run a blocking keychain call on the default thread pool."""
+            return asyncio.get_running_loop().run_in_executor(None, func, *args)
+        
+        def validate_api_key(request: web.Request) -> bool:
+            """Validate the API key from the request headers."""
+            # aiohttp decodes headers as UTF-8 with surrogateescape, so
+            # re-encoding recovers the exact bytes the client sent
+            auth_header = request.headers.get("Authorization", "").encode("utf-8", "surrogateescape")
+            
+            if not auth_header.startswith(b"Bearer "):
+                return False
+            
+            request_api_key = auth_header[7:]  # Remove "Bearer " prefix
+            return hmac.compare_digest(api_key_bytes, request_api_key)
+        
+        @web.middleware
+        async def auth_middleware(request: web.Request, handler):
+            """Reject unauthenticated requests and report unknown endpoints as JSON."""
+            if not validate_api_key(request):
+                return error_json("Invalid API key", 401)
+            
+            try:
+                return await handler(request)
+            except (web.HTTPNotFound, web.HTTPMethodNotAllowed):
+                return error_json("Unknown endpoint", 404)
+        
+        def is_fresh(cached: Optional[Tuple[float, bytes]]) -> bool:
+            """Check whether a cached list response can still be served."""
+            return cached is not None and time.monotonic() - cached[0] < CACHE_TTL
+        
+        async def build_list_response() -> bytes:
+            """Fetch, mask and serialize all credentials."""
+            # Bypass the per-key cache so the body is no older than its own
+            # timestamp; the fetch repopulates the cache as a side effect
+            details = await run_blocking(get_organization_details, False)
+            
+            # Mask sensitive values
+            masked_details = {}
+            for key, value in details.items():
+                masked_details[key] = _mask_sensitive_value(key, value)
+            
+            return (
+                static_meta_bytes
+                + b'"credentials":'
+                + json_dumps(masked_details)
+                + b'}'
+            )
+        
+        async def list_credentials(request: web.Request) -> web.Response:
+            """List all credentials with sensitive values masked."""
+            cached = self._list_response
+            if not is_fresh(cached):
+                # Only one request rebuilds; the rest wait and reuse its result
+                async with self._list_response_lock:
+                    cached = self._list_response
+                    if not is_fresh(cached):
+                        generation = self._list_response_generation
+                        cached = (time.monotonic(), await build_list_response())
+                        if generation == self._list_response_generation:
+                            self._list_response = cached
+            
+            return response_bytes(cached[1])
+        
+        async def get_credential(request: web.Request) -> web.Response:
+            """Get a specific credential."""
+            key = request.match_info["key"]
+            
+            if key not in ORG_KEYS_SET:
+                return error_json(f"Unknown key: {key}", 404)
+            
+            value = await run_blocking(get_specific_detail, key)
+            
+            if value is None:
+                return error_json(f"No value found for key: {key}", 404)
+            
+            return response_json({
+                "key": key,
+                "value": value,
+                "masked_value": _mask_sensitive_value(key, value)
+            })
+        
+        async def store_credential(request: web.Request) -> web.Response:
+            """Store a credential."""
+            key = request.match_info["key"]
+            
+            if key not in ORG_KEYS_SET:
+                return error_json(f"Unknown key: {key}", 400)
+            
+            raw_body = await request.read()
+            try:
+                body = json_loads(raw_body) if raw_body else {}
+            except json.JSONDecodeError:
+                return error_json("Invalid JSON body", 400)
+            
+            if not isinstance(body, dict):
+                return error_json("Invalid JSON body", 400)
+            
+            if "value" not in body:
+                return error_json("Missing required field: value", 400)
+            
+            value = body["value"]
+            
+            if not isinstance(value, str):
+                return error_json("Value must be a string", 400)
+            
+            if not value:
+                return error_json("Value cannot be empty", 400)
+            
+            if not is_storable_value(value):
+                return error_json("Value cannot contain line breaks or NUL characters", 400)
+            
+            # Store the credential
+            stored = await run_blocking(store_in_keychain, SERVICE_NAME, key, value)
+            self._list_response = None
+            self._list_response_generation += 1
+            
+            if stored:
+                return response_json({
+                    "message": f"Successfully stored {key} in Keychain",
+                    "key": key,
+                    "masked_value": _mask_sensitive_value(key, value)
+                })
+            
+            return error_json(f"Failed to store {key} in Keychain", 500)
+        
+        async def create_lock(app: web.Application):
+            """Create the list response lock on the running event loop."""
+            self._list_response_lock = asyncio.Lock()
+        
+        app = web.Application(middlewares=[auth_middleware])
+        app.on_startup.append(create_lock)
+        app.add_routes([
+            web.get("/credentials", list_credentials),
+            web.get("/credentials/{key}", get_credential),
+            web.post("/credentials/{key}", store_credential),
+        ])
+        return app
 
 def main():
     """Main entry point for the server."""
+    import argparse
+    
     parser = argparse.ArgumentParser(description="Secrets Manager Server")
     parser.add_argument("--host", default="localhost", help="Host to bind to")
     parser.add_argument("--port", type=int, default=8000, help="Port to listen on")
@@ -23,6 +23,10 @@ setup(
         "Operating System :: MacOS :: MacOS X",
     ],
     python_requires=">=3.8",
+    install_requires=[
+        "aiohttp>=3.8",
+        "orjson>=3.0",
+    ],
     entry_points={
         "console_scripts": [
             "secrets-manager=secrets_manager.cli:main",